@@ -4,6 +4,7 @@
 # License: GNU General Public License version 3, or any later version
 # See top-level LICENSE file for more information
 
+from functools import lru_cache
 from io import open
 from os import path
 
@@ -16,23 +17,29 @@ with open(path.join(here, "README.md"), encoding="utf-8") as f:
     long_description = f.read()
 
 
-def parse_requirements(name=None):
-    if name:
-        reqf = "requirements-%s.txt" % name
-    else:
-        reqf = "requirements.txt"
-
+@lru_cache(maxsize=None)
+def _read_requirements(reqf):
     requirements = []
     if not path.exists(reqf):
-        return requirements
+        return tuple(requirements)
 
     with open(reqf) as f:
-        for line in f.readlines():
+        for line in f:
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
             requirements.append(line)
-    return requirements
+    return tuple(requirements)
+
+
+def parse_requirements(name=None):
+    if name:
+        reqf = "requirements-%s.txt" % name
+    else:
+        reqf = "requirements.txt"
+
+    # a new list on each call, so the extras never share one
+    return list(_read_requirements(reqf))
 
 
 setup(
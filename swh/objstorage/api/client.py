@@ -52,4 +52,6 @@ class RemoteObjStorage(RPCClient):
             params=params,
             stream=True,
         )
-        yield from msgpack.Unpacker(response.raw, raw=False)
+        # Read the stream in large chunks rather than msgpack's default of
+        # 16KiB: a full page of object ids then only takes a few reads.
+        yield from msgpack.Unpacker(response.raw, raw=False, read_size=1024 * 1024)
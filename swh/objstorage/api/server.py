@@ -4,9 +4,9 @@
 # See top-level LICENSE file for more information
 
 import contextlib
-import functools
 import logging
 import os
+import threading
 from typing import Iterator
 
 from flask import request
@@ -24,14 +24,11 @@ from swh.objstorage.objstorage import DEFAULT_LIMIT
 
 
 def timed(f):
-    @functools.wraps(f)
-    def w(*a, **kw):
-        with statsd.timed(
-            "swh_objstorage_request_duration_seconds", tags={"endpoint": f.__name__}
-        ):
-            return f(*a, **kw)
-
-    return w
+    # Use statsd.timed as a decorator rather than as a context manager: the
+    # timer and its tags are then built once, not on every request.
+    return statsd.timed(
+        "swh_objstorage_request_duration_seconds", tags={"endpoint": f.__name__}
+    )(f)
 
 
 @contextlib.contextmanager
@@ -43,9 +40,16 @@ def timed_context(f_name):
 
 
 def get_objstorage():
+    """Return the objstorage shared by all requests served by this process.
+
+    The backend is only built on first use; the lock prevents concurrent
+    requests (threaded WSGI workers) from building several instances.
+    """
     global objstorage
     if objstorage is None:
-        objstorage = get_swhobjstorage(**app.config["objstorage"])
+        with objstorage_lock:
+            if objstorage is None:
+                objstorage = get_swhobjstorage(**app.config["objstorage"])
 
     return objstorage
 
@@ -75,6 +79,9 @@ app = ObjStorageServerApp(
     backend_factory=get_objstorage,
 )
 objstorage = None
+objstorage_lock = threading.Lock()
+
+LIST_CONTENT_CHUNK_SIZE = 64 * 1024
 
 
 @app.errorhandler(Error)
@@ -103,8 +110,16 @@ def list_content():
     def generate() -> Iterator[bytes]:
         with timed_context("list_content"):
             packer = msgpack.Packer(use_bin_type=True)
+            # Send the ids in chunks of a few KiB instead of one chunk of a
+            # few dozen bytes per object.
+            buf = bytearray()
             for obj in get_objstorage().list_content(last_obj_id, limit=limit):
-                yield packer.pack(obj)
+                buf += packer.pack(obj)
+                if len(buf) >= LIST_CONTENT_CHUNK_SIZE:
+                    yield bytes(buf)
+                    buf.clear()
+            if buf:
+                yield bytes(buf)
 
     return app.response_class(generate())
 
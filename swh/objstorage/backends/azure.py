@@ -4,33 +4,49 @@
 # See top-level LICENSE file for more information
 
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import contextlib
 import datetime
-from itertools import product
-import string
+from itertools import islice
+import os
 from typing import Dict, Iterator, List, Optional, Union
 import warnings
 
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.blob import (
     ContainerClient,
     ContainerSasPermissions,
     generate_container_sas,
 )
 from azure.storage.blob.aio import ContainerClient as AsyncContainerClient
+import requests
 from typing_extensions import Literal
+from urllib3.util.retry import Retry
 
-from swh.model import hashutil
 from swh.objstorage.exc import Error, ObjNotFoundError
 from swh.objstorage.interface import CompositeObjId, ObjId
 from swh.objstorage.objstorage import (
+    DEFAULT_LIMIT,
     ObjStorage,
     compressors,
     compute_hash,
     decompressors,
+    objid_to_default_hex,
 )
 from swh.objstorage.utils import call_async
 
+ACCESS_POLICIES = {
+    "read_only": ContainerSasPermissions(
+        read=True, list=True, delete=False, write=False
+    ),
+    "append_only": ContainerSasPermissions(
+        read=True, list=True, delete=False, write=True
+    ),
+    "full": ContainerSasPermissions(read=True, list=True, delete=True, write=True),
+}
+"""Permissions granted by the access policies of :func:`get_container_url`"""
+
 
 def get_container_url(
     account_name: str,
@@ -58,23 +74,13 @@ def get_container_url(
       the full URL of the container, with the shared access signature.
     """
 
-    access_policies = {
-        "read_only": ContainerSasPermissions(
-            read=True, list=True, delete=False, write=False
-        ),
-        "append_only": ContainerSasPermissions(
-            read=True, list=True, delete=False, write=True
-        ),
-        "full": ContainerSasPermissions(read=True, list=True, delete=True, write=True),
-    }
-
     current_time = datetime.datetime.utcnow()
 
     signature = generate_container_sas(
         account_name,
         container_name,
         account_key=account_key,
-        permission=access_policies[access_policy],
+        permission=ACCESS_POLICIES[access_policy],
         start=current_time + datetime.timedelta(minutes=-1),
         expiry=current_time + expiry,
     )
@@ -86,6 +92,45 @@ def get_container_url(
     )
 
 
+# Compression and decompression of the objects of get_batch and add_batch run
+# in these threads, shared by all the event loops of the process, so that each
+# loop can go on with the other transfers of a batch meanwhile.
+_compression_executor = ThreadPoolExecutor(thread_name_prefix="azure-compression")
+
+
+def _reset_compression_executor() -> None:
+    """Replaces the executor inherited by a forked child, as its threads do not
+    exist in the child."""
+    global _compression_executor
+    _compression_executor = ThreadPoolExecutor(thread_name_prefix="azure-compression")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_compression_executor)
+
+
+def get_shared_transport(
+    pool_connections: int = 20, pool_maxsize: int = 100
+) -> RequestsTransport:
+    """Get a transport for synchronous container clients, so that all the
+    clients of an objstorage share the same pool of HTTP connections.
+
+    Args:
+      pool_connections: number of hosts for which connections are kept
+      pool_maxsize: maximum number of connections kept for each host
+    """
+    session = requests.Session()
+    # Retries are handled by the azure pipeline, as in the default transport
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return RequestsTransport(session=session, session_owner=False)
+
+
 class AzureCloudObjStorage(ObjStorage):
     """ObjStorage backend for Azure blob storage accounts.
 
@@ -97,6 +142,10 @@ class AzureCloudObjStorage(ObjStorage):
       container_name: (deprecated) the name of the container under which objects are
         stored
       compression: the compression algorithm used to compress objects in storage
+      max_concurrency: maximum number of objects transferred at the same time by
+        ``get_batch`` and ``add_batch``
+      pool_connections: number of hosts for which HTTP connections are kept
+      pool_maxsize: maximum number of HTTP connections kept for each host
 
     Notes:
       The container url should contain the credentials via a "Shared Access
@@ -115,6 +164,9 @@ class AzureCloudObjStorage(ObjStorage):
         container_name: Optional[str] = None,
         connection_string: Optional[str] = None,
         compression="gzip",
+        max_concurrency: int = 100,
+        pool_connections: int = 20,
+        pool_maxsize: int = 100,
         **kwargs,
     ):
         if container_url is None and connection_string is None:
@@ -145,7 +197,25 @@ class AzureCloudObjStorage(ObjStorage):
         super().__init__(**kwargs)
         self.container_url = container_url
         self.connection_string = connection_string
+        self._init_transfers(
+            compression, max_concurrency, pool_connections, pool_maxsize
+        )
+
+    def _init_transfers(
+        self,
+        compression: str,
+        max_concurrency: int,
+        pool_connections: int,
+        pool_maxsize: int,
+    ) -> None:
+        """Sets up the settings and HTTP transport shared by all the container
+        clients of this objstorage."""
         self.compression = compression
+        self.max_concurrency = max_concurrency
+        self.transport = get_shared_transport(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.container_clients: Dict[str, ContainerClient] = {}
 
     def get_container_client(self, hex_obj_id):
         """Get the container client for the container that contains the object with
@@ -154,13 +224,22 @@ class AzureCloudObjStorage(ObjStorage):
         This is used to allow the PrefixedAzureCloudObjStorage to dispatch the
         client according to the prefix of the object id.
 
+        The client is created on first use, then reused.
         """
-        if self.connection_string:
-            return ContainerClient.from_connection_string(
-                self.connection_string, self.container_name
-            )
-        else:
-            return ContainerClient.from_container_url(self.container_url)
+        client = self.container_clients.get("")
+        if client is None:
+            if self.connection_string:
+                client = ContainerClient.from_connection_string(
+                    self.connection_string,
+                    self.container_name,
+                    transport=self.transport,
+                )
+            else:
+                client = ContainerClient.from_container_url(
+                    self.container_url, transport=self.transport
+                )
+            self.container_clients[""] = client
+        return client
 
     @contextlib.asynccontextmanager
     async def get_async_container_clients(self):
@@ -195,9 +274,7 @@ class AzureCloudObjStorage(ObjStorage):
 
     def _internal_id(self, obj_id: ObjId) -> str:
         """Internal id is the hex version in objstorage."""
-        if isinstance(obj_id, dict):
-            obj_id = obj_id[self.PRIMARY_HASH]
-        return hashutil.hash_to_hex(obj_id)
+        return objid_to_default_hex(obj_id)
 
     def check_config(self, *, check_write):
         """Check the configuration for this object storage"""
@@ -225,61 +302,118 @@ class AzureCloudObjStorage(ObjStorage):
         """Iterate over the objects present in the storage."""
         for client in self.get_all_container_clients():
             for obj in client.list_blobs():
-                yield {self.PRIMARY_HASH: hashutil.hash_to_bytes(obj.name)}
+                yield {self.PRIMARY_HASH: bytes.fromhex(obj.name)}
 
     def __len__(self):
         """Compute the number of objects in the current object storage.
 
+        Warning: this lists all the blobs of the storage.
+
         Returns:
             number of objects contained in the storage.
 
         """
-        return sum(1 for i in self)
+        return sum(
+            1
+            for client in self.get_all_container_clients()
+            for _ in client.list_blobs()
+        )
+
+    def _compress(self, content: bytes) -> bytes:
+        compressor = compressors[self.compression]()
+        data = compressor.compress(content)
+        data += compressor.flush()
+        return data
+
+    def _decompress(self, data: bytes, hex_obj_id: str) -> bytes:
+        decompressor = decompressors[self.compression]()
+        ret = decompressor.decompress(data)
+        if decompressor.unused_data:
+            raise Error("Corrupt object %s: trailing data found" % hex_obj_id)
+        return ret
 
     def add(self, content: bytes, obj_id: ObjId, check_presence: bool = True) -> None:
         """Add an obj in storage if it's not there already."""
-        if check_presence and obj_id in self:
-            return
-
+        # No need to check for the presence of the object beforehand (whatever
+        # check_presence is): upload_blob refuses to overwrite an existing blob,
+        # in the same request as the upload.
         hex_obj_id = self._internal_id(obj_id)
 
         # Send the compressed content
-        compressor = compressors[self.compression]()
-        data = compressor.compress(content)
-        data += compressor.flush()
+        data = self._compress(content)
 
         client = self.get_blob_client(hex_obj_id)
         try:
             client.upload_blob(data=data, length=len(data))
         except ResourceExistsError:
-            # There's a race condition between check_presence and upload_blob,
-            # that we can't get rid of as the azure api doesn't allow atomic
-            # replaces or renaming a blob. As the restore operation explicitly
-            # removes the blob, it should be safe to just ignore the error.
+            # The object is already there. As the restore operation explicitly
+            # overwrites the blob, it is safe to just ignore the error.
             pass
 
+    async def _add_async(self, content, obj_id, container_clients) -> bool:
+        """Coroutine uploading an object with the asynchronous container clients,
+        used by ``add_batch``. Returns whether the object was added, i.e. was not
+        present already."""
+        hex_obj_id = self._internal_id(obj_id)
+        data = await asyncio.get_running_loop().run_in_executor(
+            _compression_executor, self._compress, content
+        )
+        client = self.get_async_blob_client(hex_obj_id, container_clients)
+        try:
+            await client.upload_blob(data=data, length=len(data))
+        except ResourceExistsError:
+            return False
+        else:
+            return True
+
+    async def _add_batch_async(self, contents):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self.get_async_container_clients() as container_clients:
+
+            async def add(obj_id, content):
+                async with semaphore:
+                    return await self._add_async(content, obj_id, container_clients)
+
+            return await asyncio.gather(
+                *[add(obj_id, content) for obj_id, content in contents.items()]
+            )
+
+    def add_batch(self, contents, check_presence=True) -> Dict:
+        """Add a batch of new objects to the object storage, concurrently."""
+        added = call_async(self._add_batch_async, contents)
+        summary = {"object:add": 0, "object:add:bytes": 0}
+        for content, was_added in zip(contents.values(), added):
+            if was_added or not check_presence:
+                summary["object:add"] += 1
+                summary["object:add:bytes"] += len(content)
+        return summary
+
     def restore(self, content: bytes, obj_id: ObjId) -> None:
         """Restore a content."""
-        if obj_id in self:
-            self.delete(obj_id)
+        hex_obj_id = self._internal_id(obj_id)
+        data = self._compress(content)
 
-        return self.add(content, obj_id, check_presence=False)
+        client = self.get_blob_client(hex_obj_id)
+        client.upload_blob(data=data, length=len(data), overwrite=True)
 
     def get(self, obj_id: ObjId) -> bytes:
         """retrieve blob's content if found."""
         return call_async(self._get_async, obj_id)
 
-    async def _get_async(self, obj_id, container_clients=None):
+    async def _get_async(self, obj_id, container_clients=None, in_executor=False):
         """Coroutine implementing ``get(obj_id)`` using azure-storage-blob's
         asynchronous implementation.
         While ``get(obj_id)`` does not need asynchronicity, this is useful to
         ``get_batch(obj_ids)``, as it can run multiple ``_get_async`` tasks
-        concurrently."""
+        concurrently; it then passes ``in_executor=True`` to decompress the
+        objects in a thread of ``_compression_executor``, while the loop goes on
+        with the other downloads."""
         if container_clients is None:
             # If the container_clients argument is not passed, create a new
             # collection of container_clients and restart the function with it.
             async with self.get_async_container_clients() as container_clients:
-                return await self._get_async(obj_id, container_clients)
+                return await self._get_async(obj_id, container_clients, in_executor)
 
         hex_obj_id = self._internal_id(obj_id)
         client = self.get_async_blob_client(hex_obj_id, container_clients)
@@ -291,29 +425,31 @@ class AzureCloudObjStorage(ObjStorage):
         else:
             data = await download.content_as_bytes()
 
-        decompressor = decompressors[self.compression]()
-        ret = decompressor.decompress(data)
-        if decompressor.unused_data:
-            raise Error("Corrupt object %s: trailing data found" % hex_obj_id)
-        return ret
+        if not in_executor:
+            return self._decompress(data, hex_obj_id)
+        return await asyncio.get_running_loop().run_in_executor(
+            _compression_executor, self._decompress, data, hex_obj_id
+        )
 
     async def _get_async_or_none(self, obj_id, container_clients):
         """Like ``get_async(obj_id)``, but returns None instead of raising
         ResourceNotFoundError. Used by ``get_batch`` so other blobs can be returned
         even if one is missing."""
         try:
-            return await self._get_async(obj_id, container_clients)
+            return await self._get_async(obj_id, container_clients, in_executor=True)
         except ObjNotFoundError:
             return None
 
     async def _get_batch_async(self, obj_ids):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
         async with self.get_async_container_clients() as container_clients:
-            return await asyncio.gather(
-                *[
-                    self._get_async_or_none(obj_id, container_clients)
-                    for obj_id in obj_ids
-                ]
-            )
+
+            async def get_or_none(obj_id):
+                async with semaphore:
+                    return await self._get_async_or_none(obj_id, container_clients)
+
+            return await asyncio.gather(*[get_or_none(obj_id) for obj_id in obj_ids])
 
     def get_batch(self, obj_ids: List[ObjId]) -> Iterator[Optional[bytes]]:
         """Retrieve objects' raw content in bulk from storage, concurrently."""
@@ -346,18 +482,28 @@ class PrefixedAzureCloudObjStorage(AzureCloudObjStorage):
 
     accounts is a dict containing entries of the form:
         <prefix>: <container_url_for_prefix>
+
+    The other arguments are the same as :class:`AzureCloudObjStorage`'s, except
+    that ``pool_connections`` defaults to the number of accounts.
     """
 
     def __init__(
         self,
         accounts: Dict[str, Union[str, Dict[str, str]]],
         compression="gzip",
+        max_concurrency: int = 100,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: int = 100,
         **kwargs,
     ):
         # shortcut AzureCloudObjStorage __init__
         ObjStorage.__init__(self, **kwargs)
 
-        self.compression = compression
+        if pool_connections is None:
+            pool_connections = len(accounts)
+        self._init_transfers(
+            compression, max_concurrency, pool_connections, pool_maxsize
+        )
 
         # Definition sanity check
         prefix_lengths = set(len(prefix) for prefix in accounts)
@@ -369,12 +515,9 @@ class PrefixedAzureCloudObjStorage(AzureCloudObjStorage):
 
         self.prefix_len = prefix_lengths.pop()
 
-        expected_prefixes = set(
-            "".join(letters)
-            for letters in product(
-                set(string.hexdigits.lower()), repeat=self.prefix_len
-            )
-        )
+        expected_prefixes = {
+            format(i, f"0{self.prefix_len}x") for i in range(16**self.prefix_len)
+        }
         missing_prefixes = expected_prefixes - set(accounts)
         if missing_prefixes:
             raise ValueError(
@@ -407,7 +550,13 @@ class PrefixedAzureCloudObjStorage(AzureCloudObjStorage):
         internal id hex_obj_id
         """
         prefix = hex_obj_id[: self.prefix_len]
-        return ContainerClient.from_container_url(self.container_urls[prefix])
+        client = self.container_clients.get(prefix)
+        if client is None:
+            client = ContainerClient.from_container_url(
+                self.container_urls[prefix], transport=self.transport
+            )
+            self.container_clients[prefix] = client
+        return client
 
     @contextlib.asynccontextmanager
     async def get_async_container_clients(self):
@@ -440,3 +589,26 @@ class PrefixedAzureCloudObjStorage(AzureCloudObjStorage):
         yield from (
             self.get_container_client(prefix) for prefix in sorted(self.container_urls)
         )
+
+    def list_content(
+        self,
+        last_obj_id: Optional[ObjId] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> Iterator[CompositeObjId]:
+        if not last_obj_id:
+            return super().list_content(limit=limit)
+
+        last_hex_obj_id = objid_to_default_hex(last_obj_id)
+        last_prefix = last_hex_obj_id[: self.prefix_len]
+
+        def iter_from_last_obj_id():
+            # Containers holding prefixes before the one of last_obj_id only
+            # contain objects listed in previous pages, skip them entirely.
+            for prefix in sorted(self.container_urls):
+                if prefix < last_prefix:
+                    continue
+                for obj in self.get_container_client(prefix).list_blobs():
+                    if obj.name > last_hex_obj_id:
+                        yield {self.PRIMARY_HASH: bytes.fromhex(obj.name)}
+
+        return islice(iter_from_last_obj_id(), limit)
@@ -4,12 +4,11 @@
 # See top-level LICENSE file for more information
 
 import logging
-from typing import Iterator, Optional
+from typing import Iterator, List, Optional
 from urllib.parse import urljoin
 
 import requests
 
-from swh.model import hashutil
 from swh.objstorage import exc
 from swh.objstorage.interface import CompositeObjId, ObjId
 from swh.objstorage.objstorage import (
@@ -19,6 +18,7 @@ from swh.objstorage.objstorage import (
     decompressors,
     objid_to_default_hex,
 )
+from swh.objstorage.utils import ThreadLocalSession
 
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.ERROR)
@@ -32,15 +32,45 @@ class HTTPReadOnlyObjStorage(ObjStorage):
     objstorage:
       cls: http
       url: https://softwareheritage.s3.amazonaws.com/content/
+
+    Args:
+        url: base URL of the objects
+        compression: compression algorithm of the served objects
+        max_concurrency: number of objects :meth:`get_batch` downloads at
+            the same time, each from its own thread
+        max_retries: number of retries of failed connections
+        pool_connections: number of connection pools cached by the HTTP
+            adapter
+        pool_maxsize: maximum number of connections kept open per pool, shared
+            between all threads
     """
 
-    def __init__(self, url=None, compression=None, **kwargs):
+    def __init__(
+        self,
+        url=None,
+        compression=None,
+        max_concurrency=16,
+        max_retries=3,
+        pool_connections=20,
+        pool_maxsize=100,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
-        self.session = requests.sessions.Session()
         self.root_path = url
         if not self.root_path.endswith("/"):
             self.root_path += "/"
+        self._sessions = ThreadLocalSession(
+            self.root_path,
+            max_retries=max_retries,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
         self.compression = compression
+        self.max_concurrency = max_concurrency
+
+    @property
+    def session(self) -> requests.Session:
+        return self._sessions.get()
 
     def check_config(self, *, check_write):
         """Check the configuration for this object storage"""
@@ -88,6 +118,9 @@ class HTTPReadOnlyObjStorage(ObjStorage):
                 raise exc.Error("Corrupt object %s: trailing data found" % hex_obj_id)
         return ret
 
+    def get_batch(self, obj_ids: List[ObjId]) -> Iterator[Optional[bytes]]:
+        return self._get_batch_concurrently(obj_ids, self.max_concurrency)
+
     def check(self, obj_id: ObjId) -> None:
         # Check the content integrity
         obj_content = self.get(obj_id)
@@ -96,4 +129,4 @@ class HTTPReadOnlyObjStorage(ObjStorage):
             raise exc.Error(obj_id)
 
     def _path(self, obj_id):
-        return urljoin(self.root_path, hashutil.hash_to_hex(obj_id))
+        return urljoin(self.root_path, objid_to_default_hex(obj_id))
@@ -13,7 +13,6 @@ import libcloud.storage.drivers.s3
 from libcloud.storage.types import ObjectDoesNotExistError, Provider
 from typing_extensions import Literal
 
-from swh.model import hashutil
 from swh.objstorage.exc import Error, ObjNotFoundError
 from swh.objstorage.interface import CompositeObjId, ObjId
 from swh.objstorage.objstorage import (
@@ -146,7 +145,7 @@ class CloudObjStorage(ObjStorage, metaclass=abc.ABCMeta):
             if self.path_prefix:
                 name = name[len(self.path_prefix) :]
 
-            yield {self.PRIMARY_HASH: hashutil.hash_to_bytes(name)}
+            yield {self.PRIMARY_HASH: bytes.fromhex(name)}
 
     def __len__(self):
         """Compute the number of objects in the current object storage.
@@ -196,10 +195,7 @@ class CloudObjStorage(ObjStorage, metaclass=abc.ABCMeta):
 
     def _object_path(self, obj_id: ObjId) -> str:
         """Get the full path to an object"""
-        if isinstance(obj_id, dict):
-            obj_id = obj_id[self.PRIMARY_HASH]
-
-        hex_obj_id = hashutil.hash_to_hex(obj_id)
+        hex_obj_id = objid_to_default_hex(obj_id)
         if self.path_prefix:
             return self.path_prefix + hex_obj_id
         else:
@@ -11,13 +11,13 @@ from typing import Iterator, List, Optional
 
 from typing_extensions import Literal
 
-from swh.model import hashutil
 from swh.objstorage.constants import DEFAULT_LIMIT, ID_HASH_ALGO, ID_HEXDIGEST_LENGTH
 from swh.objstorage.exc import Error, ObjNotFoundError
 from swh.objstorage.interface import CompositeObjId, ObjId
 from swh.objstorage.objstorage import (
     ObjStorage,
     compressors,
+    compute_hash,
     decompressors,
     objid_to_default_hex,
 )
@@ -244,13 +244,15 @@ class PathSlicingObjStorage(ObjStorage):
             f.write(compressor.flush())
 
     def get(self, obj_id: ObjId) -> bytes:
-        if obj_id not in self:
-            raise ObjNotFoundError(obj_id)
-
-        # Open the file and return its content as bytes
+        # Open the file and return its content as bytes; a missing file is
+        # detected by open() itself, which saves a stat() per read.
         hex_obj_id = objid_to_default_hex(obj_id)
         d = decompressors[self.compression]()
-        with open(self.slicer.get_path(hex_obj_id), "rb") as f:
+        try:
+            f = open(self.slicer.get_path(hex_obj_id), "rb")
+        except FileNotFoundError:
+            raise ObjNotFoundError(obj_id) from None
+        with f:
             out = d.decompress(f.read())
         if d.unused_data:
             raise Error(
@@ -268,24 +270,16 @@ class PathSlicingObjStorage(ObjStorage):
                 "Corrupt object %s: not a proper compressed file" % hex_obj_id,
             )
 
-        checksums = hashutil.MultiHash.from_data(
-            data, hash_names=[ID_HASH_ALGO]
-        ).digest()
-
-        actual_obj_sha1 = checksums[ID_HASH_ALGO]
+        actual_hex_obj_id = compute_hash(data).hex()
         hex_obj_id = objid_to_default_hex(obj_id)
 
-        if hex_obj_id != hashutil.hash_to_hex(actual_obj_sha1):
+        if hex_obj_id != actual_hex_obj_id:
             raise Error(
-                "Corrupt object %s should have id %s"
-                % (objid_to_default_hex(obj_id), hashutil.hash_to_hex(actual_obj_sha1))
+                "Corrupt object %s should have id %s" % (hex_obj_id, actual_hex_obj_id)
             )
 
     def delete(self, obj_id: ObjId):
         super().delete(obj_id)  # Check delete permission
-        if obj_id not in self:
-            raise ObjNotFoundError(obj_id)
-
         hex_obj_id = objid_to_default_hex(obj_id)
         try:
             os.remove(self.slicer.get_path(hex_obj_id))
@@ -10,6 +10,7 @@ from urllib.parse import urljoin, urlparse
 import requests
 
 from swh.objstorage.objstorage import DEFAULT_LIMIT
+from swh.objstorage.utils import ThreadLocalSession
 
 LOGGER = logging.getLogger(__name__)
 
@@ -19,20 +20,33 @@ class HttpFiler:
 
     Objects are expected to be in a single directory.
     TODO: handle errors
+
+    Each thread talks to the filer through its own session; ``max_retries``,
+    ``pool_connections`` and ``pool_maxsize`` configure the HTTP adapter
+    (and connection pool) they share.
     """
 
-    def __init__(self, url):
+    def __init__(self, url, max_retries=3, pool_connections=20, pool_maxsize=100):
         if not url.endswith("/"):
             url = url + "/"
         self.url = url
         self.baseurl = urljoin(url, "/")
         self.basepath = urlparse(url).path
 
-        self.session = requests.Session()
-        self.session.headers["Accept"] = "application/json"
+        self._sessions = ThreadLocalSession(
+            self.baseurl,
+            headers={"Accept": "application/json"},
+            max_retries=max_retries,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
 
         self.batchsize = DEFAULT_LIMIT
 
+    @property
+    def session(self) -> requests.Session:
+        return self._sessions.get()
+
     def build_url(self, path):
         assert path == self.basepath or path.startswith(self.basepath)
         return urljoin(self.baseurl, path)
@@ -7,11 +7,10 @@ import io
 from itertools import islice
 import logging
 import os
-from typing import Iterator, Optional
+from typing import Iterator, List, Optional
 
 from typing_extensions import Literal
 
-from swh.model import hashutil
 from swh.objstorage.exc import Error, ObjNotFoundError
 from swh.objstorage.interface import CompositeObjId, ObjId
 from swh.objstorage.objstorage import (
@@ -32,14 +31,37 @@ class SeaweedFilerObjStorage(ObjStorage):
     """ObjStorage with seaweedfs abilities, using the Filer API.
 
     https://github.com/chrislusf/seaweedfs/wiki/Filer-Server-API
+
+    Args:
+        url: URL of the filer directory holding the objects
+        compression: compression algorithm of the stored objects
+        max_concurrency: maximum number of filer requests in flight during
+            a :meth:`get_batch`
+        max_retries, pool_connections, pool_maxsize: settings of the HTTP
+            adapter of the filer client, see :class:`HttpFiler`
     """
 
     PRIMARY_HASH: Literal["sha1"] = "sha1"
 
-    def __init__(self, url, compression=None, **kwargs):
+    def __init__(
+        self,
+        url,
+        compression=None,
+        max_concurrency=16,
+        max_retries=3,
+        pool_connections=20,
+        pool_maxsize=100,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
-        self.wf = HttpFiler(url)
+        self.wf = HttpFiler(
+            url,
+            max_retries=max_retries,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
         self.compression = compression
+        self.max_concurrency = max_concurrency
 
     def check_config(self, *, check_write):
         """Check the configuration for this object storage"""
@@ -110,6 +132,9 @@ class SeaweedFilerObjStorage(ObjStorage):
             raise Error("Corrupt object %s: trailing data found" % hex_obj_id)
         return ret
 
+    def get_batch(self, obj_ids: List[ObjId]) -> Iterator[Optional[bytes]]:
+        return self._get_batch_concurrently(obj_ids, self.max_concurrency)
+
     def check(self, obj_id: ObjId) -> None:
         # Check the content integrity
         obj_content = self.get(obj_id)
@@ -138,7 +163,7 @@ class SeaweedFilerObjStorage(ObjStorage):
             lastfilename = None
         for fname in islice(self.wf.iterfiles(last_file_name=lastfilename), limit):
             bytehex = fname.rsplit("/", 1)[-1]
-            yield {self.PRIMARY_HASH: hashutil.bytehex_to_hash(bytehex.encode())}
+            yield {self.PRIMARY_HASH: bytes.fromhex(bytehex)}
 
     # internal methods
     def _put_object(self, content, obj_id):
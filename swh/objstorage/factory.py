@@ -6,8 +6,6 @@
 import importlib
 
 from swh.objstorage.interface import ObjStorageInterface
-from swh.objstorage.multiplexer import MultiplexerObjStorage, StripingObjStorage
-from swh.objstorage.multiplexer.filter import add_filters
 from swh.objstorage.objstorage import ObjStorage
 
 __all__ = ["get_objstorage", "ObjStorage"]
@@ -64,7 +62,13 @@ def get_objstorage(cls: str, **kwargs) -> ObjStorageInterface:
     return ObjStorage(**kwargs)
 
 
+# The multiplexer and filter modules are imported by the functions using them,
+# so that only the requested backends get imported.
+
+
 def _construct_filtered_objstorage(storage_conf, filters_conf):
+    from swh.objstorage.multiplexer.filter import add_filters
+
     return add_filters(get_objstorage(**storage_conf), filters_conf)
 
 
@@ -72,6 +76,8 @@ OBJSTORAGE_IMPLEMENTATIONS["filtered"] = "_construct_filtered_objstorage"
 
 
 def _construct_multiplexer_objstorage(objstorages):
+    from swh.objstorage.multiplexer import MultiplexerObjStorage
+
     storages = [get_objstorage(**conf) for conf in objstorages]
     return MultiplexerObjStorage(storages)
 
@@ -80,6 +86,8 @@ OBJSTORAGE_IMPLEMENTATIONS["multiplexer"] = "_construct_multiplexer_objstorage"
 
 
 def _construct_striping_objstorage(objstorages):
+    from swh.objstorage.multiplexer import StripingObjStorage
+
     storages = [get_objstorage(**conf) for conf in objstorages]
     return StripingObjStorage(storages)
 
@@ -1,7 +1,9 @@
+from .cache_filter import LRUCacheObjStorageFilter
 from .read_write_filter import ReadObjStorageFilter
 
 _FILTERS_CLASSES = {
     "readonly": ReadObjStorageFilter,
+    "lru_cache": LRUCacheObjStorageFilter,
 }
 
 
@@ -12,6 +14,10 @@ def read_only():
     return {"type": "readonly"}
 
 
+def lru_cache(**kwargs):
+    return {"type": "lru_cache", **kwargs}
+
+
 def _filter_priority(filter_type):
     """Get the priority of this filter.
 
@@ -0,0 +1,150 @@
+# Copyright (C) 2022  The Software Heritage developers
+# See the AUTHORS file at the top-level directory of this distribution
+# License: GNU General Public License version 3, or any later version
+# See top-level LICENSE file for more information
+
+from collections import OrderedDict
+import threading
+import time
+from typing import Optional, Tuple
+
+from swh.objstorage.constants import ID_HASH_ALGO
+from swh.objstorage.multiplexer.filter.filter import ObjStorageFilter
+
+
+class LRUCacheObjStorageFilter(ObjStorageFilter):
+    """Filter that keeps the most recently read objects in memory.
+
+    Repeated reads of the same object are served from the cache without
+    hitting the underlying storage. Positive results of presence checks are
+    cached as well, so probing the same object again does not query the
+    underlying storage. Writes and deletions invalidate the cached copy of
+    the object.
+
+    The cache lives in the memory of each process: writes and deletions only
+    invalidate the cache of the process doing them, so other processes (e.g.
+    the other workers of an RPC server) may keep serving a deleted or restored
+    object until its cached copy (or presence check result) expires, ``ttl``
+    seconds after it was read.
+
+    Args:
+        storage: the storage to wrap
+        max_size: maximum total size (in bytes) of the objects kept in the
+            cache
+        max_object_size: objects bigger than this size (in bytes) are
+            never cached
+        max_entries: maximum number of presence check results kept in the
+            cache
+        ttl: number of seconds after which cached objects and presence check
+            results expire, or None to keep them until they are evicted
+    """
+
+    def __init__(
+        self,
+        storage,
+        max_size=64 * 1024 * 1024,
+        max_object_size=1024 * 1024,
+        max_entries=65536,
+        ttl: Optional[float] = 60,
+    ):
+        super().__init__(storage)
+        self.max_size = max_size
+        self.max_object_size = max_object_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # objects, with the time at which they expire
+        self._cache: "OrderedDict[bytes, Tuple[float, bytes]]" = OrderedDict()
+        self._cache_size = 0
+        # objects known to be present, with the time at which this expires
+        self._present: "OrderedDict[bytes, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, obj_id) -> bytes:
+        if isinstance(obj_id, dict):
+            return obj_id[ID_HASH_ALGO]
+        return obj_id
+
+    def _expiry(self) -> float:
+        return time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+
+    def _pop_content(self, key: bytes) -> None:
+        """Removes an object from the cache; must be called with the lock held."""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._cache_size -= len(entry[1])
+
+    def _cached_content(self, key: bytes) -> Optional[bytes]:
+        """Returns the cached copy of an object, unless it expired; must be called
+        with the lock held."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, content = entry
+        if expires_at <= time.monotonic():
+            self._pop_content(key)
+            return None
+        return content
+
+    def _invalidate(self, obj_id) -> None:
+        key = self._cache_key(obj_id)
+        with self._lock:
+            self._pop_content(key)
+            self._present.pop(key, None)
+
+    def _remember_content(self, key: bytes, content: bytes) -> None:
+        with self._lock:
+            self._pop_content(key)
+            self._cache[key] = (self._expiry(), content)
+            self._cache_size += len(content)
+            while self._cache_size > self.max_size:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cache_size -= len(evicted)
+
+    def _remember_present(self, key: bytes) -> None:
+        with self._lock:
+            self._present[key] = self._expiry()
+            self._present.move_to_end(key)
+            while len(self._present) > self.max_entries:
+                self._present.popitem(last=False)
+
+    def __contains__(self, obj_id, *args, **kwargs):
+        key = self._cache_key(obj_id)
+        with self._lock:
+            expires_at = self._present.get(key)
+            if expires_at is not None:
+                if expires_at > time.monotonic():
+                    self._present.move_to_end(key)
+                    return True
+                del self._present[key]
+            if self._cached_content(key) is not None:
+                return True
+
+        present = self.storage.__contains__(obj_id, *args, **kwargs)
+        if present:
+            self._remember_present(key)
+        return present
+
+    def add(self, content, obj_id, check_presence=True, *args, **kwargs):
+        self._invalidate(obj_id)
+        return self.storage.add(content, obj_id, check_presence, *args, **kwargs)
+
+    def restore(self, content, obj_id, *args, **kwargs):
+        self._invalidate(obj_id)
+        return self.storage.restore(content, obj_id, *args, **kwargs)
+
+    def get(self, obj_id, *args, **kwargs):
+        key = self._cache_key(obj_id)
+        with self._lock:
+            content = self._cached_content(key)
+            if content is not None:
+                self._cache.move_to_end(key)
+                return content
+
+        content = self.storage.get(obj_id, *args, **kwargs)
+        if content is not None and len(content) <= self.max_object_size:
+            self._remember_content(key, content)
+        return content
+
+    def delete(self, obj_id, *args, **kwargs):
+        self._invalidate(obj_id)
+        return self.storage.delete(obj_id, *args, **kwargs)
@@ -5,6 +5,9 @@
 
 import abc
 import bz2
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
 from itertools import dropwhile, islice
 import lzma
 from typing import Callable, Dict, Iterator, List, Optional
@@ -21,11 +24,11 @@ def objid_to_default_hex(obj_id: ObjId) -> str:
     """Converts SHA1 hashes and multi-hashes to the hexadecimal representation
     of the SHA1."""
     if isinstance(obj_id, bytes):
-        return hashutil.hash_to_hex(obj_id)
+        return obj_id.hex()
     elif isinstance(obj_id, str):
         return obj_id
     else:
-        return hashutil.hash_to_hex(obj_id[ID_HASH_ALGO])
+        return obj_id[ID_HASH_ALGO].hex()
 
 
 def compute_hash(content, algo=ID_HASH_ALGO):
@@ -39,6 +42,9 @@ def compute_hash(content, algo=ID_HASH_ALGO):
         The ID_HASH_ALGO for the content
 
     """
+    if algo in hashlib.algorithms_guaranteed:
+        # Skip the MultiHash machinery for a single plain hash
+        return hashlib.new(algo, content).digest()
     return (
         hashutil.MultiHash.from_data(
             content,
@@ -127,6 +133,34 @@ class ObjStorage(metaclass=abc.ABCMeta):
             except ObjNotFoundError:
                 yield None
 
+    def _get_batch_concurrently(
+        self: ObjStorageInterface, obj_ids: List[ObjId], max_concurrency: int
+    ) -> Iterator[Optional[bytes]]:
+        """Same as :meth:`get_batch`, but runs up to ``max_concurrency`` calls to
+        :meth:`get` at a time in a pool of threads.
+
+        Objects are only requested as earlier results are consumed, so that a
+        slow consumer does not get the whole batch buffered in memory."""
+
+        def get_or_none(obj_id: ObjId) -> Optional[bytes]:
+            try:
+                return self.get(obj_id)
+            except ObjNotFoundError:
+                return None
+
+        pending: "deque[Future[Optional[bytes]]]" = deque()
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            try:
+                for obj_id in obj_ids:
+                    if len(pending) >= max_concurrency:
+                        yield pending.popleft().result()
+                    pending.append(executor.submit(get_or_none, obj_id))
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
     @abc.abstractmethod
     def delete(self, obj_id: ObjId):
         if not self.allow_delete:
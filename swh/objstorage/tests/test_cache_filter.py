@@ -0,0 +1,145 @@
+# Copyright (C) 2022  The Software Heritage developers
+# See the AUTHORS file at the top-level directory of this distribution
+# License: GNU General Public License version 3, or any later version
+# See top-level LICENSE file for more information
+
+import unittest
+from unittest.mock import patch
+
+from swh.objstorage.exc import ObjNotFoundError
+from swh.objstorage.factory import get_objstorage
+from swh.objstorage.multiplexer.filter import lru_cache
+from swh.objstorage.objstorage import compute_hash
+
+
+class LRUCacheFilterTestCase(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = get_objstorage(
+            "filtered",
+            storage_conf={"cls": "memory", "allow_delete": True},
+            filters_conf=[lru_cache(max_size=40, max_object_size=100)],
+        )
+        self.base_storage = self.storage.storage
+        self.base_storage.allow_delete = True
+        self.contents = {}
+        for i in range(3):
+            content = b"cached content %d" % i
+            obj_id = compute_hash(content)
+            self.base_storage.add(content, obj_id)
+            self.contents[obj_id] = content
+
+    def test_get_is_cached(self):
+        obj_id, content = next(iter(self.contents.items()))
+        with patch.object(
+            self.base_storage, "get", wraps=self.base_storage.get
+        ) as base_get:
+            self.assertEqual(self.storage.get(obj_id), content)
+            self.assertEqual(self.storage.get(obj_id), content)
+            self.assertEqual(self.storage.get({"sha1": obj_id}), content)
+        self.assertEqual(base_get.call_count, 1)
+
+    def test_get_evicts_least_recently_used(self):
+        obj_ids = list(self.contents)
+        for obj_id in obj_ids:
+            self.storage.get(obj_id)
+        with patch.object(
+            self.base_storage, "get", wraps=self.base_storage.get
+        ) as base_get:
+            self.storage.get(obj_ids[2])
+            self.storage.get(obj_ids[1])
+            self.assertEqual(base_get.call_count, 0)
+            self.storage.get(obj_ids[0])
+            self.assertEqual(base_get.call_count, 1)
+
+    def test_get_evicts_to_fit_max_size(self):
+        obj_ids = list(self.contents)
+        for obj_id in obj_ids[:2]:
+            self.storage.get(obj_id)
+        content = b"x" * 30
+        obj_id = compute_hash(content)
+        self.storage.add(content, obj_id)
+        self.storage.get(obj_id)
+        with patch.object(
+            self.base_storage, "get", wraps=self.base_storage.get
+        ) as base_get:
+            self.storage.get(obj_id)
+            self.assertEqual(base_get.call_count, 0)
+            self.storage.get(obj_ids[1])
+            self.storage.get(obj_ids[0])
+            self.assertEqual(base_get.call_count, 2)
+
+    def test_get_big_object_not_cached(self):
+        content = b"x" * 101
+        obj_id = compute_hash(content)
+        self.storage.add(content, obj_id)
+        with patch.object(
+            self.base_storage, "get", wraps=self.base_storage.get
+        ) as base_get:
+            self.storage.get(obj_id)
+            self.storage.get(obj_id)
+        self.assertEqual(base_get.call_count, 2)
+
+    def test_get_expires(self):
+        obj_id, content = next(iter(self.contents.items()))
+        with patch.object(
+            self.base_storage, "get", wraps=self.base_storage.get
+        ) as base_get, patch("time.monotonic", return_value=1000.0) as monotonic:
+            self.storage.get(obj_id)
+            monotonic.return_value += self.storage.ttl - 1
+            self.storage.get(obj_id)
+            self.assertEqual(base_get.call_count, 1)
+            monotonic.return_value += 1
+            self.assertEqual(self.storage.get(obj_id), content)
+            self.assertEqual(base_get.call_count, 2)
+
+    def test_get_missing(self):
+        obj_id = compute_hash(b"missing content")
+        with self.assertRaises(ObjNotFoundError):
+            self.storage.get(obj_id)
+
+    def test_restore_invalidates(self):
+        obj_id, content = next(iter(self.contents.items()))
+        self.storage.get(obj_id)
+        self.storage.restore(b"restored content", obj_id)
+        self.assertEqual(self.storage.get(obj_id), b"restored content")
+
+    def test_delete_invalidates(self):
+        obj_id = next(iter(self.contents))
+        self.storage.get(obj_id)
+        self.storage.delete(obj_id)
+        with self.assertRaises(ObjNotFoundError):
+            self.storage.get(obj_id)
+
+    def test_contains_is_cached(self):
+        obj_id = next(iter(self.contents))
+        with patch.object(
+            self.base_storage, "__contains__", wraps=self.base_storage.__contains__
+        ) as base_contains:
+            self.assertIn(obj_id, self.storage)
+            self.assertIn(obj_id, self.storage)
+        self.assertEqual(base_contains.call_count, 1)
+
+    def test_contains_expires(self):
+        obj_id = next(iter(self.contents))
+        with patch("time.monotonic", return_value=1000.0) as monotonic:
+            self.assertIn(obj_id, self.storage)
+            # deleted through another process, which cannot invalidate this cache
+            self.base_storage.delete(obj_id)
+            monotonic.return_value += self.storage.ttl - 1
+            self.assertIn(obj_id, self.storage)
+            monotonic.return_value += 1
+            self.assertNotIn(obj_id, self.storage)
+
+    def test_contains_missing_not_cached(self):
+        content = b"late content"
+        obj_id = compute_hash(content)
+        self.assertNotIn(obj_id, self.storage)
+        self.base_storage.add(content, obj_id)
+        self.assertIn(obj_id, self.storage)
+
+    def test_delete_invalidates_contains(self):
+        obj_id = next(iter(self.contents))
+        self.assertIn(obj_id, self.storage)
+        self.storage.delete(obj_id)
+        self.assertNotIn(obj_id, self.storage)
@@ -60,6 +60,12 @@ class MockDownloadClient:
         return MockAsyncDownloadClient(self.blob_data)
 
 
+class MockUploadResult:
+    def __await__(self):
+        yield from ()
+        return {}
+
+
 class MockBlobClient:
     def __init__(self, container, blob):
         self.container = container
@@ -71,14 +77,15 @@ class MockBlobClient:
 
         return {"exists": True}
 
-    def upload_blob(self, data, length=None):
-        if self.blob in self.container.blobs:
+    def upload_blob(self, data, length=None, overwrite=False):
+        if self.blob in self.container.blobs and not overwrite:
             raise ResourceExistsError("Blob already exists")
 
         if length is not None and length != len(data):
             raise ValueError("Wrong length for blob data!")
 
         self.container.blobs[self.blob] = data
+        return MockUploadResult()
 
     def download_blob(self):
         if self.blob not in self.container.blobs:
@@ -174,7 +181,7 @@ def get_MockContainerClient():
             self.blobs = blobs[self.container_url]
 
         @classmethod
-        def from_container_url(cls, container_url):
+        def from_container_url(cls, container_url, **kwargs):
             return cls(container_url)
 
         def get_container_properties(self):
@@ -240,6 +247,118 @@ class TestMockedAzureCloudObjStorage(ObjStorageTestFixture, unittest.TestCase):
         assert d.decompress(raw_blob) == content
         assert d.unused_data == b""
 
+    def test_add_existing_no_presence_check(self):
+        content, obj_id = self.hash_content(b"test content already there")
+        self.storage.add(content, obj_id=obj_id)
+
+        with patch.object(MockBlobClient, "get_blob_properties") as props:
+            self.storage.add(b"other content", obj_id=obj_id)
+        props.assert_not_called()
+        assert self.storage.get(obj_id) == content
+
+    def test_add_batch_existing(self):
+        contents = {}
+        for i in range(10):
+            content, obj_id = self.hash_content(b"test content %02d" % i)
+            contents[obj_id] = content
+        present = dict(list(contents.items())[:4])
+        for obj_id, content in present.items():
+            self.storage.add(content, obj_id=obj_id)
+
+        ret = self.storage.add_batch(contents)
+
+        assert ret == {
+            "object:add": 6,
+            "object:add:bytes": sum(
+                len(content)
+                for obj_id, content in contents.items()
+                if obj_id not in present
+            ),
+        }
+        assert list(self.storage.get_batch(list(contents))) == list(contents.values())
+
+    def test_restore_single_request(self):
+        content, obj_id = self.hash_content(b"test content to restore")
+        self.storage.add(b"corrupted content", obj_id=obj_id)
+
+        with patch.object(MockBlobClient, "get_blob_properties") as props:
+            with patch.object(MockBlobClient, "delete_blob") as delete:
+                self.storage.restore(content, obj_id)
+        props.assert_not_called()
+        delete.assert_not_called()
+        self.storage.check(obj_id)
+
+    def test_get_batch_max_concurrency(self):
+        obj_ids = []
+        for i in range(10):
+            content, obj_id = self.hash_content(b"test content %02d" % i)
+            self.storage.add(content, obj_id=obj_id)
+            obj_ids.append(obj_id)
+
+        running = []
+        max_running = 0
+        get_async = self.storage._get_async
+
+        async def counting_get_async(obj_id, container_clients, **kwargs):
+            nonlocal max_running
+            running.append(obj_id)
+            max_running = max(max_running, len(running))
+            await asyncio.sleep(0)
+            running.remove(obj_id)
+            return await get_async(obj_id, container_clients, **kwargs)
+
+        self.storage.max_concurrency = 3
+        with patch.object(self.storage, "_get_async", counting_get_async):
+            assert None not in list(self.storage.get_batch(obj_ids))
+        assert max_running == 3
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+    def test_get_batch_after_fork(self):
+        content, obj_id = self.hash_content(b"fetched before and after fork")
+        self.storage.add(content, obj_id=obj_id)
+        assert list(self.storage.get_batch([obj_id])) == [content]
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ok = list(self.storage.get_batch([obj_id])) == [content]
+                ok = ok and self.storage.get(obj_id) == content
+                os._exit(0 if ok else 1)
+            except BaseException:
+                os._exit(2)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+        assert list(self.storage.get_batch([obj_id])) == [content]
+
+    def test_get_decompresses_inline(self):
+        content, obj_id = self.hash_content(b"decompressed inline")
+        self.storage.add(content, obj_id=obj_id)
+        with patch.object(
+            asyncio.BaseEventLoop,
+            "run_in_executor",
+            side_effect=AssertionError("get should not use an executor"),
+        ):
+            assert self.storage.get(obj_id) == content
+
+    def test_batches_use_compression_executor(self):
+        content, obj_id = self.hash_content(b"compressed in the shared executor")
+        executors = []
+        run_in_executor = asyncio.BaseEventLoop.run_in_executor
+
+        def recording_run_in_executor(loop, executor, *args):
+            executors.append(executor)
+            return run_in_executor(loop, executor, *args)
+
+        with patch.object(
+            asyncio.BaseEventLoop, "run_in_executor", recording_run_in_executor
+        ):
+            self.storage.add_batch({obj_id: content})
+            assert list(self.storage.get_batch([obj_id])) == [content]
+
+        compression_executor = swh.objstorage.backends.azure._compression_executor
+        assert executors == [compression_executor, compression_executor]
+
     def test_trailing_data_on_stored_blob(self):
         content, obj_id = self.hash_content(b"test content without garbage")
         self.storage.add(content, obj_id=obj_id)
@@ -324,6 +443,46 @@ class TestPrefixedAzureCloudObjStorage(ObjStorageTestFixture, unittest.TestCase)
                 .get_blob_properties()
             )
 
+    def test_prefixedazure_len(self):
+        self.assertEqual(len(self.storage), 0)
+        for i in range(100):
+            content, obj_id = self.hash_content(b"test_content_%02d" % i)
+            self.storage.add(content, obj_id=obj_id)
+        self.assertEqual(len(self.storage), 100)
+
+    def test_prefixedazure_list_content_skips_prefixes(self):
+        obj_ids = []
+        for i in range(100):
+            content, obj_id = self.hash_content(b"test_content_%02d" % i)
+            self.storage.add(content, obj_id=obj_id)
+            obj_ids.append(obj_id)
+        obj_ids.sort()
+        last_obj_id = max(obj_id for obj_id in obj_ids if obj_id[0] < 0xE0)
+
+        with patch.object(
+            self.storage,
+            "get_container_client",
+            wraps=self.storage.get_container_client,
+        ) as get_container_client:
+            ids = list(self.storage.list_content(last_obj_id=last_obj_id))
+
+        self.assertEqual(
+            ids, [{"sha1": obj_id} for obj_id in obj_ids if obj_id > last_obj_id]
+        )
+        self.assertEqual(
+            [call.args[0] for call in get_container_client.call_args_list],
+            ["d", "e", "f"],
+        )
+
+    def test_prefixedazure_container_clients_reused(self):
+        clients = {
+            prefix: self.storage.get_container_client(prefix)
+            for prefix in self.accounts
+        }
+        for prefix, client in clients.items():
+            self.assertIs(self.storage.get_container_client(prefix + "1234"), client)
+        self.assertEqual(len(set(map(id, clients.values()))), len(self.accounts))
+
 
 def test_get_container_url():
     # r=read, l=list, w=write, d=delete
@@ -355,6 +514,17 @@ def test_get_container_url():
         assert qs["st"][0] < qs["se"][0]
 
 
+def test_shared_transport():
+    container_url = "https://account_name.blob.core.windows.net/container_name"
+    objs = get_objstorage("azure", container_url=container_url, pool_maxsize=42)
+    clients = [objs.get_container_client(""), objs.get_container_client("")]
+
+    for client in clients:
+        assert client._pipeline._transport is objs.transport
+    adapter = objs.transport.session.get_adapter(container_url)
+    assert adapter._pool_maxsize == 42
+
+
 def test_bwcompat_args(monkeypatch):
     monkeypatch.setattr(
         swh.objstorage.backends.azure,
@@ -3,6 +3,8 @@
 # License: GNU General Public License version 3, or any later version
 # See top-level LICENSE file for more information
 
+import threading
+
 import pytest
 import requests_mock
 from requests_mock.contrib import fixture
@@ -78,6 +80,51 @@ def test_http_objstorage_get_missing():
         sto_front.get(b"\x00" * 20)
 
 
+def test_http_objstorage_get_batch():
+    sto_front, sto_back, objids = build_objstorage()
+    missing = b"\x00" * 20
+    obj_ids = objids[:10] + [missing] + objids[10:20]
+
+    assert list(sto_front.get_batch(obj_ids)) == [
+        None if obj_id == missing else sto_back.get(obj_id) for obj_id in obj_ids
+    ]
+
+
+def test_http_objstorage_get_batch_bounded():
+    sto_front, sto_back, objids = build_objstorage()
+    sto_front.max_concurrency = 4
+    requested = []
+
+    def obj_ids():
+        for obj_id in objids:
+            requested.append(obj_id)
+            yield obj_id
+
+    batch = sto_front.get_batch(obj_ids())
+    assert next(batch) == sto_back.get(objids[0])
+    assert len(requested) <= sto_front.max_concurrency + 1
+    assert list(batch) == [sto_back.get(obj_id) for obj_id in objids[1:]]
+
+
+def test_http_objstorage_session_per_thread():
+    sto_front, sto_back, objids = build_objstorage()
+    sessions = [sto_front.session]
+
+    def get_session():
+        sessions.append(sto_front.session)
+
+    for _ in range(2):
+        thread = threading.Thread(target=get_session)
+        thread.start()
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 3
+    adapter = sto_front.session.get_adapter(sto_front.root_path)
+    assert all(
+        session.get_adapter(sto_front.root_path) is adapter for session in sessions
+    )
+
+
 def test_http_objstorage_check():
     sto_front, sto_back, objids = build_objstorage()
     for objid in objids:
@@ -119,3 +166,10 @@ def test_http_cannonical_url():
     url = "http://127.0.0.1/content"
     sto = get_objstorage(cls="http", url=url)
     assert sto.root_path == url + "/"
+
+
+def test_http_connection_pool():
+    url = "http://127.0.0.1/content/"
+    sto = get_objstorage(cls="http", url=url, pool_maxsize=42)
+    adapter = sto.session.get_adapter(url)
+    assert adapter._pool_maxsize == 42
@@ -3,12 +3,20 @@
 # License: GNU General Public License version 3, or any later version
 # See top-level LICENSE file for more information
 
+from concurrent.futures import ThreadPoolExecutor
 import copy
+from io import BytesIO
+import threading
+import time
 
+import msgpack
 import pytest
 import yaml
 
+from swh.objstorage.api import server
 from swh.objstorage.api.server import load_and_check_config
+from swh.objstorage.factory import get_objstorage as get_swhobjstorage
+from swh.objstorage.objstorage import compute_hash
 
 
 def prepare_config_file(tmpdir, content, name="config.yml"):
@@ -123,3 +131,52 @@ def test_load_and_check_config(tmpdir, config):
     config_path = prepare_config_file(tmpdir, config)
     cfg = load_and_check_config(config_path)
     assert cfg == config
+
+
+def test_get_objstorage_shared_instance(monkeypatch):
+    """The backend is built once and shared by concurrent requests"""
+    monkeypatch.setattr(server, "objstorage", None)
+    monkeypatch.setitem(server.app.config, "objstorage", {"cls": "memory"})
+
+    calls = []
+
+    def slow_get_swhobjstorage(**kwargs):
+        calls.append(kwargs)
+        # leave time to the other threads to race for the initialization
+        time.sleep(0.1)
+        return get_swhobjstorage(**kwargs)
+
+    monkeypatch.setattr(server, "get_swhobjstorage", slow_get_swhobjstorage)
+
+    nb_threads = 8
+    barrier = threading.Barrier(nb_threads)
+
+    def get_objstorage(_):
+        barrier.wait()
+        return server.get_objstorage()
+
+    with ThreadPoolExecutor(max_workers=nb_threads) as executor:
+        instances = list(executor.map(get_objstorage, range(nb_threads)))
+
+    assert len(calls) == 1
+    assert all(instance is instances[0] for instance in instances)
+    assert server.get_objstorage() is instances[0]
+
+
+def test_list_content_chunked(monkeypatch):
+    """Object ids are sent in chunks of several ids"""
+    monkeypatch.setattr(server, "objstorage", None)
+    monkeypatch.setitem(server.app.config, "objstorage", {"cls": "memory"})
+    monkeypatch.setattr(server, "LIST_CONTENT_CHUNK_SIZE", 100)
+    storage = server.get_objstorage()
+    for i in range(50):
+        content = b"content %d" % i
+        storage.add(content, compute_hash(content))
+
+    response = server.app.test_client().get("/content", buffered=False)
+    chunks = list(response.response)
+
+    assert 1 < len(chunks) < 50
+    assert list(msgpack.Unpacker(BytesIO(b"".join(chunks)), raw=False)) == list(
+        storage.list_content()
+    )
@@ -0,0 +1,55 @@
+# Copyright (C) 2022  The Software Heritage developers
+# See the AUTHORS file at the top-level directory of this distribution
+# License: GNU General Public License version 3, or any later version
+# See top-level LICENSE file for more information
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import pytest
+
+from swh.objstorage.utils import call_async
+
+
+async def get_loop_and_double(x):
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop(), 2 * x
+
+
+def test_call_async():
+    loop1, ret1 = call_async(get_loop_and_double, 21)
+    loop2, ret2 = call_async(get_loop_and_double, 5)
+
+    assert (ret1, ret2) == (42, 10)
+    assert loop1 is loop2
+    assert not loop1.is_running()
+
+
+def test_call_async_threads():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_loop, ret = executor.submit(call_async, get_loop_and_double, 1).result()
+
+    loop, _ = call_async(get_loop_and_double, 1)
+    assert ret == 2
+    assert other_loop is not loop
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_call_async_fork():
+    parent_loop, _ = call_async(get_loop_and_double, 1)
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            child_loop, ret = call_async(get_loop_and_double, 2)
+            os._exit(0 if ret == 4 and child_loop is not parent_loop else 1)
+        except BaseException:
+            os._exit(2)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+    loop, ret = call_async(get_loop_and_double, 3)
+    assert loop is parent_loop
+    assert ret == 6
@@ -4,13 +4,86 @@
 # See top-level LICENSE file for more information
 
 import asyncio
+import os
+import threading
+from typing import List
+import weakref
 
+import requests
 
-def call_async(f, *args):
-    """Calls an async coroutine from a synchronous function."""
-    loop = asyncio.new_event_loop()
+# Event loops inherited from the parent process after a fork. Their selector is
+# shared with the parent, so they must not be closed in the child (closing
+# unregisters the parent's self-pipe from it): they are kept referenced instead.
+_inherited_loops: List[asyncio.AbstractEventLoop] = []
+
+
+def _close_loop(loop: asyncio.AbstractEventLoop, pid: int) -> None:
+    if os.getpid() != pid:
+        _inherited_loops.append(loop)
+        return
     try:
-        return loop.run_until_complete(f(*args))
-    finally:
         loop.run_until_complete(loop.shutdown_asyncgens())
+    except RuntimeError:
+        # another event loop is running in the thread collecting this one
+        pass
+    finally:
         loop.close()
+
+
+class _ThreadEventLoop:
+    """Event loop of a thread, closed when the thread exits (or at interpreter
+    exit)."""
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        weakref.finalize(self, _close_loop, self.loop, self.pid)
+
+
+_thread_local = threading.local()
+
+
+def call_async(f, *args):
+    """Calls an async coroutine from a synchronous function.
+
+    Each thread reuses its own event loop across calls, instead of paying for the
+    creation and teardown of a new loop every time. A forked child does not reuse
+    the loops of its parent, but creates its own."""
+    thread_loop = getattr(_thread_local, "event_loop", None)
+    if thread_loop is None or thread_loop.pid != os.getpid():
+        thread_loop = _thread_local.event_loop = _ThreadEventLoop()
+    return thread_loop.loop.run_until_complete(f(*args))
+
+
+class ThreadLocalSession:
+    """Hands out one :class:`requests.Session` per thread, as sessions are not
+    documented as thread-safe.
+
+    All the sessions share the same :class:`requests.adapters.HTTPAdapter`
+    (mounted on ``url``), so connections are still pooled across threads."""
+
+    def __init__(
+        self,
+        url,
+        headers=None,
+        max_retries=3,
+        pool_connections=20,
+        pool_maxsize=100,
+    ):
+        self.url = url
+        self.headers = headers or {}
+        self.adapter = requests.adapters.HTTPAdapter(
+            max_retries=max_retries,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+        self._local = threading.local()
+
+    def get(self) -> requests.Session:
+        """Returns the session of the calling thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount(self.url, self.adapter)
+        return session